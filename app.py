@@ -1,14 +1,10 @@
 import streamlit as st
-import plotly.graph_objects as go
-import plotly.express as px
-import random
-import time
+import hashlib
+from operator import itemgetter
 from PIL import Image
 import io
-import base64
-import tensorflow as tf
-from tensorflow.keras.applications.efficientnet import preprocess_input
-import numpy as np
+
+from inference import CLASS_NAMES, real_prediction_batch
 
 # =============================================================================
 # Page Config
@@ -79,14 +75,145 @@ TUMOR_INFO = {
     },
 }
 
-CLASS_NAMES = ["glioma", "meningioma", "notumor", "pituitary"]
+# Parallel per-class arrays in CLASS_NAMES order, materialized once so the
+# chart builders don't redo TUMOR_INFO lookups on every render.
+ORDERED_LABELS = [TUMOR_INFO[c]["label"] for c in CLASS_NAMES]
+ORDERED_COLORS = [TUMOR_INFO[c]["color"] for c in CLASS_NAMES]
+
+
+def _build_diagnosis_card(info):
+    severity_icon = "🔴" if info["severity_level"] == "high" else ("🟡" if info["severity_level"] == "moderate" else "🟢")
+    return f"""
+        <div class="card">
+            <div style="display: flex; align-items: center; gap: 8px; margin-bottom: 16px;">
+                <span style="font-size: 18px;">🧠</span>
+                <h3 style="margin: 0; font-size: 16px; color: {TEXT_PRIMARY} !important;">Diagnosis</h3>
+            </div>
+            <h2 style="font-size: 26px; font-weight: 800; color: {info['color']}; margin: 0 0 8px;">{info['label']}</h2>
+            <div style="display: flex; align-items: center; gap: 8px; margin-bottom: 12px;">
+                <span>{severity_icon}</span>
+                <span class="badge" style="border: 1px solid {info['color']}; color: {info['color']}; font-size: 11px;">
+                    {info['severity']}
+                </span>
+            </div>
+            <p style="font-size: 13px; color: {TEXT_MUTED}; line-height: 1.6; margin-bottom: 16px;">
+                {info['description']}
+            </p>
+        </div>
+    """
+
+
+def _build_symptom_grid(info):
+    return '<div class="tab-grid">' + "".join(f"""
+                <div class="symptom-item">
+                    <div class="dot" style="background-color: {info['color']};"></div>
+                    <span style="font-size: 14px; color: {TEXT_SECONDARY};">{symptom}</span>
+                </div>
+                """ for symptom in info["symptoms"]) + "</div>"
+
+
+def _build_treatment_grid(info):
+    return '<div class="tab-grid">' + "".join(f"""
+                <div class="symptom-item">
+                    <div style="width: 22px; height: 22px; border-radius: 50%; background-color: rgba(45,212,191,0.13);
+                                display: flex; align-items: center; justify-content: center; flex-shrink: 0;
+                                color: {ACCENT}; font-size: 11px; font-weight: 700;">{i+1}</div>
+                    <span style="font-size: 14px; color: {TEXT_SECONDARY};">{treat}</span>
+                </div>
+                """ for i, treat in enumerate(info["treatment"])) + "</div>"
+
+
+# TUMOR_INFO is immutable, so the diagnosis card and the clinical tab items
+# for each class are rendered once at import instead of on every rerun.
+# The tab items come as single two-column CSS grids, so each tab is one
+# markdown element instead of an st.columns(2) pair.
+DIAGNOSIS_CARD_HTML = {cls: _build_diagnosis_card(info) for cls, info in TUMOR_INFO.items()}
+SYMPTOM_GRID_HTML = {cls: _build_symptom_grid(info) for cls, info in TUMOR_INFO.items()}
+TREATMENT_GRID_HTML = {cls: _build_treatment_grid(info) for cls, info in TUMOR_INFO.items()}
+
+# Probability-bar template, pre-filled per class at import; only the live
+# percentage is substituted per render (twice: formatted text and bar width).
+BAR_TPL_BY_CLASS = {
+    cls: f"""
+            <div style="margin-bottom: 8px; padding: 0 24px;">
+                <div style="display: flex; justify-content: space-between; margin-bottom: 4px;">
+                    <span style="font-size: 12px; color: {TEXT_MUTED};">{info['label']}</span>
+                    <span style="font-size: 12px; font-family: monospace; color: {info['color']}; font-weight: 600;">{{pct:.1f}}%</span>
+                </div>
+                <div style="width: 100%; height: 6px; background-color: {BG_SECONDARY}; border-radius: 4px; overflow: hidden;">
+                    <div style="width: {{pct}}%; height: 100%; background-color: {info['color']}; border-radius: 4px;"></div>
+                </div>
+            </div>
+        """
+    for cls, info in TUMOR_INFO.items()
+}
+
+# The "Detectable Tumor Classes" badge row is pure constants, so it is built
+# once at import as a single block - this also fixes the old two-call render
+# that left a stray empty wrapper div above the badges.
+_BADGES_HTML = f"""
+    <div style="text-align: center; margin-top: 24px;">
+        <p style="font-size: 11px; color: {TEXT_MUTED}; text-transform: uppercase; letter-spacing: 2px; font-weight: 600; margin-bottom: 12px;">Detectable Tumor Classes</p>
+        <div style="display: flex; justify-content: center; gap: 10px; flex-wrap: wrap;">
+            {"".join(f'''
+            <div class="class-badge" style="border: 1px solid {TUMOR_INFO[cls]['color']};">
+                <div class="badge-dot" style="background-color: {TUMOR_INFO[cls]['color']};"></div>
+                <span style="color: {TUMOR_INFO[cls]['color']};">{TUMOR_INFO[cls]['label']}</span>
+            </div>
+            ''' for cls in CLASS_NAMES)}
+        </div>
+    </div>
+    """
+
+# Static disclaimer and footer blocks, likewise built once.
+DISCLAIMER_HTML = f"""
+    <div style="background-color: {BG_SECONDARY}; border: 1px solid {BORDER}; border-radius: 12px;
+                padding: 14px 20px; margin-top: 24px; text-align: center;">
+        <p style="font-size: 12px; color: {TEXT_MUTED}; margin: 0; line-height: 1.6;">
+            This tool is for educational and research purposes only. It is not a substitute for
+            professional medical diagnosis. Always consult a qualified healthcare provider for medical advice.
+        </p>
+    </div>
+    """
+
+FOOTER_HTML = f"""
+    <div style="border-top: 1px solid {BORDER}; margin-top: 40px; padding-top: 20px; text-align: center;">
+        <p style="font-size: 12px; color: {TEXT_MUTED};">
+            Brain Tumor MRI Classifier &bull; Powered by EfficientNet &bull; For research and educational purposes only
+        </p>
+    </div>
+    """
+
+# The hero banner is fully static, so its HTML is built once at import
+# rather than re-interpolated on every rerun.
+HERO_HTML = f"""
+    <div style="text-align: center; padding: 20px 0 10px;">
+        <div style="display: inline-flex; align-items: center; gap: 8px;
+                    border: 1px solid rgba(45,212,191,0.2); background-color: rgba(45,212,191,0.05);
+                    border-radius: 999px; padding: 6px 16px; margin-bottom: 16px;">
+            <span style="font-size: 14px;">🧠</span>
+            <span style="color: {ACCENT}; font-size: 12px; font-weight: 600; letter-spacing: 1px; text-transform: uppercase;">
+                AI-Powered Diagnostics
+            </span>
+        </div>
+        <h1 style="font-size: 42px; font-weight: 800; margin: 0; color: {TEXT_PRIMARY} !important;">
+            Brain Tumor MRI <span style="color: {ACCENT};">Classifier</span>
+        </h1>
+        <p style="color: {TEXT_MUTED}; font-size: 16px; max-width: 560px; margin: 12px auto 0; line-height: 1.6;">
+            Upload an MRI scan and receive instant AI-powered classification
+            across 4 tumor types with detailed probability analysis.
+        </p>
+    </div>
+    """
 
 
 # =============================================================================
 # Styles
 # =============================================================================
-def inject_styles():
-    st.markdown(f"""
+# Built once at import: every token interpolated here is a module-level
+# constant, so reruns push the same string instead of re-formatting ~2KB
+# of CSS through 40+ interpolations each time.
+_STYLES_HTML = f"""
     <style>
         /* ---- Global ---- */
         .stApp {{
@@ -240,6 +367,16 @@ def inject_styles():
             font-size: 12px;
             font-weight: 600;
         }}
+        .tab-grid {{
+            display: grid;
+            grid-template-columns: 1fr 1fr;
+            gap: 0 24px;
+        }}
+        .card-grid {{
+            display: grid;
+            grid-template-columns: repeat(4, 1fr);
+            gap: 16px;
+        }}
         .feature-card {{
             background-color: {BG_CARD};
             border: 1px solid {BORDER};
@@ -266,6 +403,85 @@ def inject_styles():
             padding: 12px 16px;
             margin-bottom: 8px;
         }}
+        div[data-testid="stImage"] {{
+            background-color: {BG_CARD};
+            border: 1px solid {BORDER};
+            border-radius: 14px;
+            padding: 16px;
+        }}
+        div[data-testid="stImage"] img {{
+            background-color: rgba(0,0,0,0.4);
+            border-radius: 12px;
+            max-height: 280px;
+            object-fit: contain;
+        }}
+        .analyzed-badge {{
+            position: relative;
+            float: right;
+            margin: -52px 24px 0 0;
+            background-color: rgba(0,0,0,0.5);
+            border-radius: 999px;
+            padding: 4px 12px;
+            font-size: 11px;
+            font-weight: 700;
+        }}
+        .spec-row {{
+            display: flex;
+            justify-content: space-between;
+            padding: 8px 0;
+            border-bottom: 1px solid {BORDER};
+        }}
+        .spec-row span:first-child {{
+            color: {TEXT_MUTED};
+            font-size: 13px;
+        }}
+        .spec-row span:last-child {{
+            color: {TEXT_PRIMARY};
+            font-size: 13px;
+            font-weight: 600;
+        }}
+        .class-chip {{
+            display: flex;
+            align-items: center;
+            gap: 10px;
+            padding: 8px 12px;
+            margin-bottom: 6px;
+            background-color: {BG_SECONDARY};
+            border-radius: 10px;
+            border: 1px solid {BORDER};
+        }}
+        .class-chip span {{
+            color: {TEXT_SECONDARY};
+            font-size: 13px;
+            font-weight: 500;
+        }}
+        .dot-sm {{
+            width: 10px;
+            height: 10px;
+            border-radius: 50%;
+            flex-shrink: 0;
+        }}
+        .class-badge {{
+            display: inline-flex;
+            align-items: center;
+            gap: 8px;
+            border-radius: 999px;
+            padding: 6px 14px;
+            opacity: 0.85;
+        }}
+        .class-badge .badge-dot {{
+            width: 8px;
+            height: 8px;
+            border-radius: 50%;
+        }}
+        .class-badge span {{
+            font-size: 12px;
+            font-weight: 600;
+        }}
+        @keyframes spin {{
+            0% {{ transform: rotate(0deg); }}
+            100% {{ transform: rotate(360deg); }}
+        }}
         .dot {{
             width: 8px;
             height: 8px;
@@ -273,151 +489,182 @@ def inject_styles():
             flex-shrink: 0;
         }}
     </style>
-    """, unsafe_allow_html=True)
-
+    """
 
-# =============================================================================
-# Prediction logic (simulated)
-# =============================================================================
-@st.cache_resource
-def load_model():
-    return tf.keras.models.load_model("tumor_model.keras")
 
-model = load_model()
+def inject_styles():
+    st.markdown(_STYLES_HTML, unsafe_allow_html=True)
 
-def real_prediction(image_bytes):
-    image = Image.open(io.BytesIO(image_bytes)).convert("RGB")
-    image = image.resize((300, 300))
 
-    img_array = np.array(image)
-    img_array = preprocess_input(img_array)
-    img_array = np.expand_dims(img_array, axis=0)
+@st.cache_data(show_spinner=False, max_entries=64)
+def display_thumbnail(image_bytes, max_px=600):
+    """Downscale the upload for browser display, separate from the model input.
 
-    preds = model.predict(img_array, verbose=0)[0]
+    Embedding the original multi-megabyte MRI in the page inflates the payload
+    for no visual benefit; a 600px thumbnail renders identically in the card.
+    """
+    image = Image.open(io.BytesIO(image_bytes)).convert("RGB")
+    image.thumbnail((max_px, max_px), Image.Resampling.BILINEAR)
+    buf = io.BytesIO()
+    # JPEG beats PNG 5-10x on photographic MRI content; quality 85 is
+    # visually transparent at thumbnail size.
+    image.save(buf, format="JPEG", quality=85, optimize=True)
+    return buf.getvalue()
 
-    probs = {
-        CLASS_NAMES[i]: round(float(preds[i] * 100), 2)
-        for i in range(len(CLASS_NAMES))
-    }
 
-    top_class = CLASS_NAMES[np.argmax(preds)]
-    confidence = probs[top_class]
 
-    return {
-        "class_name": top_class,
-        "confidence": confidence,
-        "probabilities": probs,
-    }
 # =============================================================================
 # Chart helpers
 # =============================================================================
 
+# Static layout dicts built once at import. Passing these to go.Figure as a
+# plain spec skips the per-render update_layout schema walk; only the trace
+# data varies between results.
+_DONUT_LAYOUT = dict(
+    uirevision="constant",
+    transition=dict(duration=0),
+    plot_bgcolor="rgba(0,0,0,0)",
+    paper_bgcolor="rgba(0,0,0,0)",
+    font=dict(color=TEXT_SECONDARY),
+    showlegend=True,
+    legend=dict(
+        font=dict(color=TEXT_SECONDARY, size=12),
+        bgcolor="rgba(0,0,0,0)",
+        orientation="h",
+        yanchor="bottom",
+        y=-0.15,
+        xanchor="center",
+        x=0.5,
+    ),
+    margin=dict(l=10, r=10, t=10, b=40),
+    height=280,
+)
 
+_GAUGE_LAYOUT = dict(
+    uirevision="constant",
+    transition=dict(duration=0),
+    plot_bgcolor="rgba(0,0,0,0)",
+    paper_bgcolor="rgba(0,0,0,0)",
+    font=dict(color=TEXT_SECONDARY),
+    margin=dict(l=30, r=30, t=30, b=10),
+    height=220,
+)
 
-def create_donut_chart(probs):
-    labels = [TUMOR_INFO[k]["label"] for k in probs]
-    values = list(probs.values())
-    colors = [TUMOR_INFO[k]["color"] for k in probs]
-
-    fig = go.Figure(go.Pie(
-        labels=labels,
-        values=values,
-        hole=0.55,
-        marker=dict(colors=colors, line=dict(color="#0c1220", width=3)),
-        textinfo="percent",
-        textposition="inside",
-        textfont=dict(color=TEXT_PRIMARY, size=13),
-        insidetextorientation="horizontal",
-        hovertemplate="<b>%{label}</b><br>%{value:.2f}%<extra></extra>",
-    ))
-    fig.update_layout(
-        plot_bgcolor="rgba(0,0,0,0)",
-        paper_bgcolor="rgba(0,0,0,0)",
-        font=dict(color=TEXT_SECONDARY),
-        showlegend=True,
-        legend=dict(
-            font=dict(color=TEXT_SECONDARY, size=12),
-            bgcolor="rgba(0,0,0,0)",
-            orientation="h",
-            yanchor="bottom",
-            y=-0.15,
-            xanchor="center",
-            x=0.5,
+_RADAR_LAYOUT = dict(
+    uirevision="constant",
+    transition=dict(duration=0),
+    polar=dict(
+        bgcolor="rgba(0,0,0,0)",
+        radialaxis=dict(
+            visible=True,
+            range=[0, 100],
+            gridcolor=BORDER,
+            tickfont=dict(color=TEXT_MUTED, size=10),
+            ticksuffix="%",
         ),
-        margin=dict(l=10, r=10, t=10, b=40),
-        height=280,
-    )
-    return fig
+        angularaxis=dict(
+            gridcolor=BORDER,
+            tickfont=dict(color=TEXT_SECONDARY, size=12),
+        ),
+    ),
+    plot_bgcolor="rgba(0,0,0,0)",
+    paper_bgcolor="rgba(0,0,0,0)",
+    font=dict(color=TEXT_SECONDARY),
+    showlegend=False,
+    margin=dict(l=40, r=40, t=30, b=30),
+    height=280,
+)
 
 
+@st.cache_data(show_spinner=False)
+def create_donut_chart(values_t):
+    # Deferred so the landing page never pays the ~0.5s plotly import;
+    # sys.modules makes every call after the first a dict hit.
+    import plotly.graph_objects as go
+
+    values = list(values_t)
+    return go.Figure({
+        "data": [dict(
+            type="pie",
+            labels=ORDERED_LABELS,
+            values=values,
+            hole=0.55,
+            marker=dict(colors=ORDERED_COLORS, line=dict(color="#0c1220", width=3)),
+            textinfo="percent",
+            textposition="inside",
+            textfont=dict(color=TEXT_PRIMARY, size=13),
+            insidetextorientation="horizontal",
+            hovertemplate="<b>%{label}</b><br>%{value:.2f}%<extra></extra>",
+        )],
+        "layout": _DONUT_LAYOUT,
+    })
+
+
+@st.cache_data(show_spinner=False)
 def create_gauge(value, color, label):
-    fig = go.Figure(go.Indicator(
-        mode="gauge+number",
-        value=value,
-        number=dict(suffix="%", font=dict(color=color, size=36)),
-        title=dict(text=label, font=dict(color=TEXT_SECONDARY, size=14)),
-        gauge=dict(
-            axis=dict(range=[0, 100], tickfont=dict(color=TEXT_MUTED, size=11), dtick=25),
-            bar=dict(color=color, thickness=0.7),
-            bgcolor=BG_SECONDARY,
-            bordercolor=BORDER,
-            borderwidth=1,
-            steps=[
-                dict(range=[0, 40], color=f"{BORDER}"),
-                dict(range=[40, 70], color=f"{BG_SECONDARY}"),
-                dict(range=[70, 100], color=f"{BORDER}"),
-            ],
-            threshold=dict(line=dict(color=color, width=3), thickness=0.8, value=value),
-        ),
-    ))
-    fig.update_layout(
-        plot_bgcolor="rgba(0,0,0,0)",
-        paper_bgcolor="rgba(0,0,0,0)",
-        font=dict(color=TEXT_SECONDARY),
-        margin=dict(l=30, r=30, t=30, b=10),
-        height=220,
-    )
-    return fig
-
-
-def create_radar_chart(probs):
-    labels = [TUMOR_INFO[k]["label"] for k in probs]
-    values = list(probs.values())
-    colors_list = [TUMOR_INFO[k]["color"] for k in probs]
-
-    fig = go.Figure()
-    fig.add_trace(go.Scatterpolar(
-        r=values + [values[0]],
-        theta=labels + [labels[0]],
-        fill="toself",
-        fillcolor="rgba(45,212,191,0.1)",
-        line=dict(color=ACCENT, width=2),
-        marker=dict(color=colors_list + [colors_list[0]], size=8),
-        name="Probability",
-    ))
-    fig.update_layout(
-        polar=dict(
-            bgcolor="rgba(0,0,0,0)",
-            radialaxis=dict(
-                visible=True,
-                range=[0, 100],
-                gridcolor=BORDER,
-                tickfont=dict(color=TEXT_MUTED, size=10),
-                ticksuffix="%",
-            ),
-            angularaxis=dict(
-                gridcolor=BORDER,
-                tickfont=dict(color=TEXT_SECONDARY, size=12),
+    import plotly.graph_objects as go
+
+    return go.Figure({
+        "data": [dict(
+            type="indicator",
+            mode="gauge+number",
+            value=value,
+            number=dict(suffix="%", font=dict(color=color, size=36)),
+            title=dict(text=label, font=dict(color=TEXT_SECONDARY, size=14)),
+            gauge=dict(
+                axis=dict(range=[0, 100], tickfont=dict(color=TEXT_MUTED, size=11), dtick=25),
+                bar=dict(color=color, thickness=0.7),
+                bgcolor=BG_SECONDARY,
+                bordercolor=BORDER,
+                borderwidth=1,
+                steps=[
+                    dict(range=[0, 40], color=f"{BORDER}"),
+                    dict(range=[40, 70], color=f"{BG_SECONDARY}"),
+                    dict(range=[70, 100], color=f"{BORDER}"),
+                ],
+                threshold=dict(line=dict(color=color, width=3), thickness=0.8, value=value),
             ),
-        ),
-        plot_bgcolor="rgba(0,0,0,0)",
-        paper_bgcolor="rgba(0,0,0,0)",
-        font=dict(color=TEXT_SECONDARY),
-        showlegend=False,
-        margin=dict(l=40, r=40, t=30, b=30),
-        height=280,
-    )
-    return fig
+        )],
+        "layout": _GAUGE_LAYOUT,
+    })
+
+
+@st.cache_data(show_spinner=False)
+def create_radar_chart(values_t):
+    import plotly.graph_objects as go
+
+    values = list(values_t)
+    return go.Figure({
+        "data": [dict(
+            type="scatterpolar",
+            r=values + [values[0]],
+            theta=ORDERED_LABELS + [ORDERED_LABELS[0]],
+            fill="toself",
+            fillcolor="rgba(45,212,191,0.1)",
+            line=dict(color=ACCENT, width=2),
+            marker=dict(color=ORDERED_COLORS + [ORDERED_COLORS[0]], size=8),
+            name="Probability",
+        )],
+        "layout": _RADAR_LAYOUT,
+    })
+
+
+@st.cache_data(show_spinner=False)
+def radar_chart_svg(values_t):
+    """Static SVG via kaleido, or None when kaleido is unavailable."""
+    try:
+        return create_radar_chart(values_t).to_image(format="svg").decode()
+    except Exception:
+        return None
+
+
+@st.cache_data(show_spinner=False)
+def donut_chart_svg(values_t):
+    try:
+        return create_donut_chart(values_t).to_image(format="svg").decode()
+    except Exception:
+        return None
+
 
 
 # =============================================================================
@@ -442,25 +689,23 @@ def render_sidebar():
             "Training Acc.": "87.5%",
             "Framework": "Tensorflow",
         }
-        for k, v in specs.items():
-            st.markdown(f"""
-            <div style="display: flex; justify-content: space-between; padding: 8px 0; border-bottom: 1px solid {BORDER};">
-                <span style="color: {TEXT_MUTED}; font-size: 13px;">{k}</span>
-                <span style="color: {TEXT_PRIMARY}; font-size: 13px; font-weight: 600;">{v}</span>
+        # One markdown call per block: each st.markdown is a separate
+        # protobuf + websocket message, so the rows are joined first.
+        st.markdown("".join(f"""
+            <div class="spec-row">
+                <span>{k}</span>
+                <span>{v}</span>
             </div>
-            """, unsafe_allow_html=True)
+            """ for k, v in specs.items()), unsafe_allow_html=True)
 
         st.markdown("<br>", unsafe_allow_html=True)
         st.markdown(f"#### Detectable Classes")
-        for cls in CLASS_NAMES:
-            info = TUMOR_INFO[cls]
-            st.markdown(f"""
-            <div style="display: flex; align-items: center; gap: 10px; padding: 8px 12px; margin-bottom: 6px;
-                        background-color: {BG_SECONDARY}; border-radius: 10px; border: 1px solid {BORDER};">
-                <div style="width: 10px; height: 10px; border-radius: 50%; background-color: {info['color']};"></div>
-                <span style="color: {TEXT_SECONDARY}; font-size: 13px; font-weight: 500;">{info['label']}</span>
+        st.markdown("".join(f"""
+            <div class="class-chip">
+                <div class="dot-sm" style="background-color: {TUMOR_INFO[cls]['color']};"></div>
+                <span>{TUMOR_INFO[cls]['label']}</span>
             </div>
-            """, unsafe_allow_html=True)
+            """ for cls in CLASS_NAMES), unsafe_allow_html=True)
 
         st.markdown(f"""
         <br>
@@ -476,116 +721,87 @@ def render_sidebar():
 # Hero Section
 # =============================================================================
 def render_hero():
-    st.markdown(f"""
-    <div style="text-align: center; padding: 20px 0 10px;">
-        <div style="display: inline-flex; align-items: center; gap: 8px;
-                    border: 1px solid rgba(45,212,191,0.2); background-color: rgba(45,212,191,0.05);
-                    border-radius: 999px; padding: 6px 16px; margin-bottom: 16px;">
-            <span style="font-size: 14px;">🧠</span>
-            <span style="color: {ACCENT}; font-size: 12px; font-weight: 600; letter-spacing: 1px; text-transform: uppercase;">
-                AI-Powered Diagnostics
-            </span>
-        </div>
-        <h1 style="font-size: 42px; font-weight: 800; margin: 0; color: {TEXT_PRIMARY} !important;">
-            Brain Tumor MRI <span style="color: {ACCENT};">Classifier</span>
-        </h1>
-        <p style="color: {TEXT_MUTED}; font-size: 16px; max-width: 560px; margin: 12px auto 0; line-height: 1.6;">
-            Upload an MRI scan and receive instant AI-powered classification
-            across 4 tumor types with detailed probability analysis.
-        </p>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(HERO_HTML, unsafe_allow_html=True)
 
 
 # =============================================================================
 # Feature cards
 # =============================================================================
+_FEATURES = [
+    ("⚡", "Real-time Analysis", "Instant classification results powered by deep learning"),
+    ("🧠", "EfficientNet Model", "State-of-the-art CNN architecture for accurate predictions"),
+    ("📊", "Detailed Reports", "Comprehensive probability breakdown and clinical insights"),
+    ("🔒", "Private & Secure", "All processing happens locally \u2014 your data never leaves"),
+]
+
+# Static cards as one CSS-grid block: a single markdown element replaces
+# four st.columns containers plus four markdown calls per rerun.
+_FEATURES_HTML = '<div class="card-grid">' + "".join(f"""
+    <div class="feature-card">
+        <div style="background-color: rgba(45,212,191,0.09); width: 40px; height: 40px; border-radius: 10px;
+                    display: flex; align-items: center; justify-content: center; margin: 0 auto 12px; font-size: 18px;">
+            {icon}
+        </div>
+        <h4 style="font-size: 13px; font-weight: 700; color: {TEXT_PRIMARY} !important; margin: 0 0 6px;">{title}</h4>
+        <p style="font-size: 11px; color: {TEXT_MUTED}; margin: 0; line-height: 1.5;">{desc}</p>
+    </div>
+    """ for icon, title, desc in _FEATURES) + "</div>"
+
+
 def render_features():
-    features = [
-        ("⚡", "Real-time Analysis", "Instant classification results powered by deep learning"),
-        ("🧠", "EfficientNet Model", "State-of-the-art CNN architecture for accurate predictions"),
-        ("📊", "Detailed Reports", "Comprehensive probability breakdown and clinical insights"),
-        ("🔒", "Private & Secure", "All processing happens locally \u2014 your data never leaves"),
-    ]
-    cols = st.columns(4)
-    for i, (icon, title, desc) in enumerate(features):
-        with cols[i]:
-            st.markdown(f"""
-            <div class="feature-card">
-                <div style="background-color: rgba(45,212,191,0.09); width: 40px; height: 40px; border-radius: 10px;
-                            display: flex; align-items: center; justify-content: center; margin: 0 auto 12px; font-size: 18px;">
-                    {icon}
-                </div>
-                <h4 style="font-size: 13px; font-weight: 700; color: {TEXT_PRIMARY} !important; margin: 0 0 6px;">{title}</h4>
-                <p style="font-size: 11px; color: {TEXT_MUTED}; margin: 0; line-height: 1.5;">{desc}</p>
-            </div>
-            """, unsafe_allow_html=True)
+    st.markdown(_FEATURES_HTML, unsafe_allow_html=True)
 
 
 # =============================================================================
 # How it works
 # =============================================================================
-def render_how_it_works():
-    st.markdown(f"""
+_STEPS = [
+    ("01", "📤", "Upload Scan", "Drop or select an MRI brain scan image in JPG or PNG format"),
+    ("02", "🔬", "AI Processing", "EfficientNet analyzes the scan through multiple neural layers"),
+    ("03", "📋", "Classification", "The model classifies the scan into one of 4 tumor categories"),
+    ("04", "📈", "Results", "View detailed probabilities, charts, and clinical information"),
+]
+
+_STEPS_HTML = f"""
     <div style="text-align: center; margin: 40px 0 20px;">
         <h2 style="font-size: 22px; font-weight: 700; color: {TEXT_PRIMARY} !important; margin: 0;">How It Works</h2>
         <p style="color: {TEXT_MUTED}; font-size: 14px; margin-top: 6px;">Simple four-step process from upload to diagnosis</p>
     </div>
-    """, unsafe_allow_html=True)
-
-    steps = [
-        ("01", "📤", "Upload Scan", "Drop or select an MRI brain scan image in JPG or PNG format"),
-        ("02", "🔬", "AI Processing", "EfficientNet analyzes the scan through multiple neural layers"),
-        ("03", "📋", "Classification", "The model classifies the scan into one of 4 tumor categories"),
-        ("04", "📈", "Results", "View detailed probabilities, charts, and clinical information"),
-    ]
-    cols = st.columns(4)
-    for i, (num, icon, title, desc) in enumerate(steps):
-        with cols[i]:
-            st.markdown(f"""
-            <div class="feature-card" style="text-align: left;">
-                <div style="display: flex; align-items: center; gap: 10px; margin-bottom: 12px;">
-                    <div style="background-color: rgba(45,212,191,0.09); width: 36px; height: 36px; border-radius: 10px;
-                                display: flex; align-items: center; justify-content: center; font-size: 16px;">
-                        {icon}
-                    </div>
-                    <span class="step-num">{num}</span>
-                </div>
-                <h4 style="font-size: 14px; font-weight: 600; color: {TEXT_PRIMARY} !important; margin: 0 0 6px;">{title}</h4>
-                <p style="font-size: 12px; color: {TEXT_MUTED}; margin: 0; line-height: 1.5;">{desc}</p>
+    """ + '<div class="card-grid">' + "".join(f"""
+    <div class="feature-card" style="text-align: left;">
+        <div style="display: flex; align-items: center; gap: 10px; margin-bottom: 12px;">
+            <div style="background-color: rgba(45,212,191,0.09); width: 36px; height: 36px; border-radius: 10px;
+                        display: flex; align-items: center; justify-content: center; font-size: 16px;">
+                {icon}
             </div>
-            """, unsafe_allow_html=True)
+            <span class="step-num">{num}</span>
+        </div>
+        <h4 style="font-size: 14px; font-weight: 600; color: {TEXT_PRIMARY} !important; margin: 0 0 6px;">{title}</h4>
+        <p style="font-size: 12px; color: {TEXT_MUTED}; margin: 0; line-height: 1.5;">{desc}</p>
+    </div>
+    """ for num, icon, title, desc in _STEPS) + "</div>"
+
+
+def render_how_it_works():
+    st.markdown(_STEPS_HTML, unsafe_allow_html=True)
 
     # Class badges
-    st.markdown(f"""
-    <div style="text-align: center; margin-top: 24px;">
-        <p style="font-size: 11px; color: {TEXT_MUTED}; text-transform: uppercase; letter-spacing: 2px; font-weight: 600; margin-bottom: 12px;">Detectable Tumor Classes</p>
-        <div style="display: flex; justify-content: center; gap: 10px; flex-wrap: wrap;">
-    """, unsafe_allow_html=True)
-    badges_html = ""
-    for cls in CLASS_NAMES:
-        info = TUMOR_INFO[cls]
-        badges_html += f"""
-        <div style="display: inline-flex; align-items: center; gap: 8px; border: 1px solid {info['color']};
-                    border-radius: 999px; padding: 6px 14px; opacity: 0.85;">
-            <div style="width: 8px; height: 8px; border-radius: 50%; background-color: {info['color']};"></div>
-            <span style="font-size: 12px; font-weight: 600; color: {info['color']};">{info['label']}</span>
-        </div>
-        """
-    st.markdown(f"""
-        <div style="display: flex; justify-content: center; gap: 10px; flex-wrap: wrap;">
-            {badges_html}
-        </div>
-    """, unsafe_allow_html=True)
+    st.markdown(_BADGES_HTML, unsafe_allow_html=True)
 
 
 # =============================================================================
 # Results
 # =============================================================================
-def render_results(result, image_bytes):
+@st.fragment
+def render_results(result, image_bytes, key_prefix="scan0"):
+    """Results subtree; runs as a fragment so interactions inside it (tab
+    switches, chart events) rerun only this function, not the whole page."""
     cls = result["class_name"]
     info = TUMOR_INFO[cls]
-    probs = result["probabilities"]
+    # Tuple positionally aligned with CLASS_NAMES - already the hashable
+    # cache key the chart builders want (same probabilities, same cached
+    # figure across reruns).
+    chart_values = result["probabilities"]
 
     st.markdown(f"""
     <div style="display: flex; align-items: center; justify-content: space-between; margin-bottom: 20px;">
@@ -597,57 +813,23 @@ def render_results(result, image_bytes):
     col_img, col_diag, col_gauge = st.columns([1, 1.2, 1])
 
     with col_img:
+        # st.image streams the bytes through Streamlit's media endpoint
+        # (cacheable by the browser) instead of inlining a base64 blob into
+        # the markdown payload on every rerun; the card look is CSS.
+        st.image(display_thumbnail(image_bytes), use_container_width=True)
         st.markdown(f"""
-        <div class="card" style="padding: 16px;">
-            <div style="background-color: rgba(0,0,0,0.4); border-radius: 12px; overflow: hidden; position: relative; text-align: center;">
-                <img src="data:image/png;base64,{base64.b64encode(image_bytes).decode()}"
-                     style="max-height: 280px; border-radius: 12px; object-fit: contain; width: 100%;" />
-                <div style="position: absolute; top: 12px; right: 12px;
-                            background-color: rgba(0,0,0,0.5); color: {info['color']};
-                            border: 1px solid {info['color']}; border-radius: 999px;
-                            padding: 4px 12px; font-size: 11px; font-weight: 700;">
-                    Analyzed
-                </div>
-            </div>
+        <div class="analyzed-badge" style="color: {info['color']}; border: 1px solid {info['color']};">
+            Analyzed
         </div>
         """, unsafe_allow_html=True)
 
     with col_diag:
-        severity_icon = "🔴" if info["severity_level"] == "high" else ("🟡" if info["severity_level"] == "moderate" else "🟢")
-        sorted_probs = sorted(probs.items(), key=lambda x: x[1], reverse=True)
+        sorted_probs = sorted(zip(CLASS_NAMES, chart_values), key=itemgetter(1), reverse=True)
 
-        st.markdown(f"""
-        <div class="card">
-            <div style="display: flex; align-items: center; gap: 8px; margin-bottom: 16px;">
-                <span style="font-size: 18px;">🧠</span>
-                <h3 style="margin: 0; font-size: 16px; color: {TEXT_PRIMARY} !important;">Diagnosis</h3>
-            </div>
-            <h2 style="font-size: 26px; font-weight: 800; color: {info['color']}; margin: 0 0 8px;">{info['label']}</h2>
-            <div style="display: flex; align-items: center; gap: 8px; margin-bottom: 12px;">
-                <span>{severity_icon}</span>
-                <span class="badge" style="border: 1px solid {info['color']}; color: {info['color']}; font-size: 11px;">
-                    {info['severity']}
-                </span>
-            </div>
-            <p style="font-size: 13px; color: {TEXT_MUTED}; line-height: 1.6; margin-bottom: 16px;">
-                {info['description']}
-            </p>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(DIAGNOSIS_CARD_HTML[cls], unsafe_allow_html=True)
 
-        for k, v in sorted_probs:
-            p_info = TUMOR_INFO[k]
-            st.markdown(f"""
-            <div style="margin-bottom: 8px; padding: 0 24px;">
-                <div style="display: flex; justify-content: space-between; margin-bottom: 4px;">
-                    <span style="font-size: 12px; color: {TEXT_MUTED};">{p_info['label']}</span>
-                    <span style="font-size: 12px; font-family: monospace; color: {p_info['color']}; font-weight: 600;">{v:.1f}%</span>
-                </div>
-                <div style="width: 100%; height: 6px; background-color: {BG_SECONDARY}; border-radius: 4px; overflow: hidden;">
-                    <div style="width: {v}%; height: 100%; background-color: {p_info['color']}; border-radius: 4px;"></div>
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
+        bars_html = "".join(BAR_TPL_BY_CLASS[k].format(pct=v) for k, v in sorted_probs)
+        st.markdown(bars_html, unsafe_allow_html=True)
 
     with col_gauge:
         st.markdown(f"""
@@ -659,7 +841,8 @@ def render_results(result, image_bytes):
         </div>
         """, unsafe_allow_html=True)
         st.plotly_chart(create_gauge(result["confidence"], info["color"], info["label"]),
-                        use_container_width=True, config={"displayModeBar": False})
+                        key=f"{key_prefix}-gauge", use_container_width=True,
+                        config={"displayModeBar": False})
 
         st.markdown(f"""
         <div style="display: flex; gap: 12px; margin-top: -10px;">
@@ -686,7 +869,15 @@ def render_results(result, image_bytes):
             <h3 style="font-size: 15px; font-weight: 600; color: {TEXT_PRIMARY} !important; margin: 0 0 12px;">Radar Analysis</h3>
         </div>
         """, unsafe_allow_html=True)
-        st.plotly_chart(create_radar_chart(probs), use_container_width=True, config={"displayModeBar": False})
+        # Hover/zoom add little to these summary charts; when kaleido is
+        # installed they ship as plain SVG markup instead of Plotly.js
+        # trace JSON plus a client-side render.
+        radar_svg = radar_chart_svg(chart_values)
+        if radar_svg is not None:
+            st.markdown(radar_svg, unsafe_allow_html=True)
+        else:
+            st.plotly_chart(create_radar_chart(chart_values), key=f"{key_prefix}-radar",
+                            use_container_width=True, config={"displayModeBar": False})
 
     with col_donut:
         st.markdown(f"""
@@ -694,7 +885,12 @@ def render_results(result, image_bytes):
             <h3 style="font-size: 15px; font-weight: 600; color: {TEXT_PRIMARY} !important; margin: 0 0 12px;">Distribution</h3>
         </div>
         """, unsafe_allow_html=True)
-        st.plotly_chart(create_donut_chart(probs), use_container_width=True, config={"displayModeBar": False})
+        donut_svg = donut_chart_svg(chart_values)
+        if donut_svg is not None:
+            st.markdown(donut_svg, unsafe_allow_html=True)
+        else:
+            st.plotly_chart(create_donut_chart(chart_values), key=f"{key_prefix}-donut",
+                            use_container_width=True, config={"displayModeBar": False})
 
     # ---------- Clinical tabs ----------
     st.markdown("<br>", unsafe_allow_html=True)
@@ -707,28 +903,10 @@ def render_results(result, image_bytes):
     tab_symptoms, tab_treatment, tab_stats = st.tabs(["🩺 Symptoms", "💊 Treatment", "📊 Statistics"])
 
     with tab_symptoms:
-        cols = st.columns(2)
-        for i, symptom in enumerate(info["symptoms"]):
-            with cols[i % 2]:
-                st.markdown(f"""
-                <div class="symptom-item">
-                    <div class="dot" style="background-color: {info['color']};"></div>
-                    <span style="font-size: 14px; color: {TEXT_SECONDARY};">{symptom}</span>
-                </div>
-                """, unsafe_allow_html=True)
+        st.markdown(SYMPTOM_GRID_HTML[cls], unsafe_allow_html=True)
 
     with tab_treatment:
-        cols = st.columns(2)
-        for i, treat in enumerate(info["treatment"]):
-            with cols[i % 2]:
-                st.markdown(f"""
-                <div class="symptom-item">
-                    <div style="width: 22px; height: 22px; border-radius: 50%; background-color: rgba(45,212,191,0.13);
-                                display: flex; align-items: center; justify-content: center; flex-shrink: 0;
-                                color: {ACCENT}; font-size: 11px; font-weight: 700;">{i+1}</div>
-                    <span style="font-size: 14px; color: {TEXT_SECONDARY};">{treat}</span>
-                </div>
-                """, unsafe_allow_html=True)
+        st.markdown(TREATMENT_GRID_HTML[cls], unsafe_allow_html=True)
 
     with tab_stats:
         col_prev, col_surv = st.columns(2)
@@ -748,15 +926,7 @@ def render_results(result, image_bytes):
             """, unsafe_allow_html=True)
 
     # ---------- Disclaimer ----------
-    st.markdown(f"""
-    <div style="background-color: {BG_SECONDARY}; border: 1px solid {BORDER}; border-radius: 12px;
-                padding: 14px 20px; margin-top: 24px; text-align: center;">
-        <p style="font-size: 12px; color: {TEXT_MUTED}; margin: 0; line-height: 1.6;">
-            This tool is for educational and research purposes only. It is not a substitute for
-            professional medical diagnosis. Always consult a qualified healthcare provider for medical advice.
-        </p>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(DISCLAIMER_HTML, unsafe_allow_html=True)
 
 
 # =============================================================================
@@ -772,55 +942,73 @@ def main():
     st.markdown("<br>", unsafe_allow_html=True)
 
     # ---------- Upload ----------
-    uploaded_file = st.file_uploader(
-        "Upload MRI Scan",
-        type=["jpg", "jpeg", "png"],
-        help="Drop or select an MRI brain scan image",
-        label_visibility="collapsed",
-    )
-
-    if uploaded_file is not None:
-        image_bytes = uploaded_file.getvalue()
-
-        # Run prediction (simulate)
-        if "prediction" not in st.session_state or st.session_state.get("last_file") != uploaded_file.name:
-            with st.spinner(""):
-                # Custom spinner
-                st.markdown(f"""
-                <div style="display: flex; flex-direction: column; align-items: center; gap: 12px; padding: 20px;">
-                    <div style="display: flex; align-items: center; gap: 12px; background-color: {BG_CARD};
-                                border: 1px solid {BORDER}; border-radius: 12px; padding: 16px 24px;">
-                        <div style="width: 20px; height: 20px; border: 2px solid {ACCENT}; border-top-color: transparent;
-                                    border-radius: 50%; animation: spin 0.8s linear infinite;"></div>
-                        <div>
-                            <p style="color: {TEXT_PRIMARY}; font-size: 14px; font-weight: 600; margin: 0;">Analyzing MRI Scan...</p>
-                            <p style="color: {TEXT_MUTED}; font-size: 12px; margin: 2px 0 0;">Running EfficientNet classification model</p>
-                        </div>
+    # The form batches widget events: inference only fires on an explicit
+    # submit, never on intermediate rerun churn.
+    with st.form("mri_upload", border=False):
+        uploaded_files = st.file_uploader(
+            "Upload MRI Scan",
+            type=["jpg", "jpeg", "png"],
+            help="Drop or select one or more MRI brain scan images",
+            label_visibility="collapsed",
+            accept_multiple_files=True,
+        )
+        submitted = st.form_submit_button("🔬 Analyze Scan", use_container_width=True)
+
+    if uploaded_files:
+        files_bytes = tuple(f.getvalue() for f in uploaded_files)
+        # Content hash, not filenames: re-exported scans that reuse a name
+        # still get fresh predictions, and identical re-uploads don't rerun.
+        file_key = tuple(
+            hashlib.blake2b(b, digest_size=16).hexdigest() for b in files_bytes
+        )
+        analyzed = st.session_state.get("last_file") == file_key
+
+        # Run prediction
+        if submitted and not analyzed:
+            # Spinner lives in a placeholder so it can be cleared and the
+            # results rendered in this same pass - no st.rerun() second
+            # execution of the whole script.
+            spinner_slot = st.empty()
+            spinner_slot.markdown(f"""
+            <div style="display: flex; flex-direction: column; align-items: center; gap: 12px; padding: 20px;">
+                <div style="display: flex; align-items: center; gap: 12px; background-color: {BG_CARD};
+                            border: 1px solid {BORDER}; border-radius: 12px; padding: 16px 24px;">
+                    <div style="width: 20px; height: 20px; border: 2px solid {ACCENT}; border-top-color: transparent;
+                                border-radius: 50%; animation: spin 0.8s linear infinite;"></div>
+                    <div>
+                        <p style="color: {TEXT_PRIMARY}; font-size: 14px; font-weight: 600; margin: 0;">Analyzing MRI Scan...</p>
+                        <p style="color: {TEXT_MUTED}; font-size: 12px; margin: 2px 0 0;">Running EfficientNet classification model</p>
                     </div>
-                    <style>@keyframes spin {{ 0% {{ transform: rotate(0deg); }} 100% {{ transform: rotate(360deg); }} }}</style>
                 </div>
-                """, unsafe_allow_html=True)
-                time.sleep(1.5)
-
-            st.session_state["prediction"] = real_prediction(image_bytes)
-            st.session_state["last_file"] = uploaded_file.name
-            st.rerun()
+            </div>
+            """, unsafe_allow_html=True)
 
-        render_results(st.session_state["prediction"], image_bytes)
+            st.session_state["prediction"] = real_prediction_batch(files_bytes)
+            st.session_state["last_file"] = file_key
+            spinner_slot.empty()
+            analyzed = True
+
+        if analyzed:
+            predictions = st.session_state["prediction"]
+            if len(uploaded_files) == 1:
+                render_results(predictions[0], files_bytes[0])
+            else:
+                scan_tabs = st.tabs([f.name for f in uploaded_files])
+                for i, (tab, prediction, img_bytes) in enumerate(zip(scan_tabs, predictions, files_bytes)):
+                    with tab:
+                        render_results(prediction, img_bytes, key_prefix=f"scan{i}")
 
     else:
-        st.session_state.pop("prediction", None)
-        st.session_state.pop("last_file", None)
+        # Only touch session state when there is something to clear; the
+        # common idle rerun then skips the state-diff machinery entirely.
+        if "prediction" in st.session_state:
+            del st.session_state["prediction"]
+        if "last_file" in st.session_state:
+            del st.session_state["last_file"]
         render_how_it_works()
 
     # ---------- Footer ----------
-    st.markdown(f"""
-    <div style="border-top: 1px solid {BORDER}; margin-top: 40px; padding-top: 20px; text-align: center;">
-        <p style="font-size: 12px; color: {TEXT_MUTED};">
-            Brain Tumor MRI Classifier &bull; Powered by EfficientNet &bull; For research and educational purposes only
-        </p>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(FOOTER_HTML, unsafe_allow_html=True)
 
 
 if __name__ == "__main__":
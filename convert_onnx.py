@@ -0,0 +1,28 @@
+"""Export tumor_model.keras to ONNX for CPU serving with ONNX Runtime.
+
+    python convert_onnx.py
+
+Produces `tumor_model.onnx`. When the file is present next to app.py and
+`onnxruntime` is installed, the app serves it through an InferenceSession
+(graph optimizations + MLAS SIMD kernels) instead of the TF model.
+"""
+
+import sys
+
+ONNX_PATH = "tumor_model.onnx"
+
+
+def main():
+    try:
+        import tensorflow as tf
+        import tf2onnx
+    except ImportError as exc:
+        sys.exit(f"conversion requires tensorflow and tf2onnx: {exc}")
+
+    model = tf.keras.models.load_model("tumor_model.keras")
+    tf2onnx.convert.from_keras(model, opset=15, output_path=ONNX_PATH)
+    print(f"Wrote {ONNX_PATH}")
+
+
+if __name__ == "__main__":
+    main()
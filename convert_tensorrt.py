@@ -0,0 +1,110 @@
+"""Export tumor_model.keras to an ONNX graph and build a TensorRT engine.
+
+Run this offline on the deployment GPU box (TensorRT engines are not portable
+across GPU architectures):
+
+    python convert_tensorrt.py [fp16|int8|fp8]
+    python convert_tensorrt.py tf-trt [calibration_dir]
+
+The first form produces `tumor_model.onnx` and prints the `trtexec` command that compiles
+it into `tumor_model.plan` at the chosen precision. FP16 is the default and
+needs no calibration. INT8 (Ampere+) and FP8 (Hopper+) use tensor-core integer
+or fp8 math for a further 2-4x over FP16 on conv-heavy nets, but INT8 needs a
+calibration cache (feed ~500 representative MRI slices through trtexec's
+--calib flow, or quantize the graph first with nvidia-modelopt) - and always
+benchmark the low-precision engine against FP16 on the actual GPU before
+shipping it. When `tumor_model.plan` is present next to app.py (and the
+`tensorrt` + `pycuda` packages are installed), the app loads the engine
+instead of the FP32 Keras model and falls back to Keras otherwise.
+
+The `tf-trt` form takes the TF-TRT route instead: it converts the model to
+a SavedModel whose graph embeds TensorRT-optimized segments, in INT8 when a
+calibration directory of representative MRI slices is given (tensor-core
+integer GEMMs, ~10x over FP32 on T4-class GPUs for CNNs) or FP16 otherwise.
+The result lands in `tumor_model_trt/`, which the app loads through its
+SavedModel signature - unlike a raw .plan engine this needs no pycuda, only
+a TensorRT-enabled TensorFlow build on the serving host.
+"""
+
+import os
+import sys
+
+ONNX_PATH = "tumor_model.onnx"
+ENGINE_PATH = "tumor_model.plan"
+TF_TRT_PATH = "tumor_model_trt"
+PRECISION_FLAGS = {
+    "fp16": "--fp16",
+    "int8": "--int8 --calib=mri_calib.cache",
+    "fp8": "--fp8",
+}
+
+
+def _convert_tf_trt(calib_dir):
+    import numpy as np
+    import tensorflow as tf
+    from tensorflow.python.compiler.tensorrt import trt_convert as trt
+
+    model = tf.keras.models.load_model("tumor_model.keras")
+    tmp_dir = "tumor_model_savedmodel_tmp"
+    model.export(tmp_dir)
+
+    def input_fn():
+        yield (np.zeros((1, 300, 300, 3), dtype=np.float32),)
+
+    if calib_dir:
+        from PIL import Image
+
+        def calib_fn():
+            names = sorted(os.listdir(calib_dir))[:500]
+            for name in names:
+                if not name.lower().endswith((".jpg", ".jpeg", ".png")):
+                    continue
+                img = Image.open(os.path.join(calib_dir, name)).convert("RGB")
+                arr = np.asarray(img.resize((300, 300)), dtype=np.float32)
+                yield (arr[None],)
+
+        converter = trt.TrtGraphConverterV2(
+            input_saved_model_dir=tmp_dir,
+            precision_mode=trt.TrtPrecisionMode.INT8,
+            use_calibration=True,
+        )
+        converter.convert(calibration_input_fn=calib_fn)
+    else:
+        converter = trt.TrtGraphConverterV2(
+            input_saved_model_dir=tmp_dir,
+            precision_mode=trt.TrtPrecisionMode.FP16,
+        )
+        converter.convert()
+    # Pre-build the TensorRT engines for batch-of-1 so the first user
+    # request doesn't pay the engine compilation cost.
+    converter.build(input_fn=input_fn)
+    converter.save(TF_TRT_PATH)
+    print(f"Wrote {TF_TRT_PATH}")
+
+
+def main():
+    precision = sys.argv[1] if len(sys.argv) > 1 else "fp16"
+    if precision == "tf-trt":
+        _convert_tf_trt(sys.argv[2] if len(sys.argv) > 2 else None)
+        return
+    if precision not in PRECISION_FLAGS:
+        sys.exit(f"unknown precision: {precision} (expected fp16, int8, fp8 or tf-trt)")
+
+    try:
+        import tensorflow as tf
+        import tf2onnx
+    except ImportError as exc:
+        sys.exit(f"conversion requires tensorflow and tf2onnx: {exc}")
+
+    model = tf.keras.models.load_model("tumor_model.keras")
+    tf2onnx.convert.from_keras(model, opset=13, output_path=ONNX_PATH)
+    print(f"Wrote {ONNX_PATH}")
+    print(f"Now build the {precision} engine on the target GPU with:")
+    print(
+        f"  trtexec --onnx={ONNX_PATH} {PRECISION_FLAGS[precision]} "
+        f"--saveEngine={ENGINE_PATH} --shapes=input:1x300x300x3"
+    )
+
+
+if __name__ == "__main__":
+    main()
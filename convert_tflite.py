@@ -0,0 +1,92 @@
+"""Post-training quantization of tumor_model.keras for CPU/edge serving.
+
+    python convert_tflite.py fp16
+    python convert_tflite.py dynamic
+    python convert_tflite.py int8 [calibration_dir]
+
+`fp16` halves the model size with no kernel-compatibility risk (weights are
+stored as float16 and dequantized on load; compute stays in the well-tuned
+FP32 paths), producing `tumor_model_fp16.tflite`.
+
+`dynamic` is dynamic-range quantization: weights stored int8, activations
+kept fp32 and quantized on the fly per inference. No calibration images
+needed, ~4x smaller weights pulled through cache, and XNNPACK dispatches
+the int8 dot products to VNNI on capable CPUs. Writes
+`tumor_model_dyn.tflite`; benchmark it against the fp16 artifact on the
+serving host and rename the winner to `tumor_model_fp16.tflite` for the
+app to pick up.
+
+`int8` performs full-integer quantization and needs calibration images (a
+few hundred representative MRI slices, any of the four classes) read from
+`calibration_dir` (default: ./calibration), resized to 300x300, and fed
+through the converter's representative dataset so activations get proper
+INT8 ranges. Produces `tumor_model_int8.tflite`. Note that INT8 can be
+slower than FP32 on desktop x86 where TFLite kernels are NEON-tuned; the
+app therefore prefers the FP16 artifact unless TUMOR_TFLITE_INT8=1 is set.
+
+When either .tflite file sits next to app.py, the app runs it through
+tf.lite.Interpreter instead of the FP32 Keras model.
+"""
+
+import os
+import sys
+
+FP16_PATH = "tumor_model_fp16.tflite"
+DYNAMIC_PATH = "tumor_model_dyn.tflite"
+INT8_PATH = "tumor_model_int8.tflite"
+IMG_EXTS = (".jpg", ".jpeg", ".png")
+
+
+def _representative_dataset(calib_dir, size=(300, 300), limit=500):
+    import numpy as np
+    from PIL import Image
+
+    def gen():
+        count = 0
+        for name in sorted(os.listdir(calib_dir)):
+            if not name.lower().endswith(IMG_EXTS) or count >= limit:
+                continue
+            img = Image.open(os.path.join(calib_dir, name)).convert("RGB")
+            arr = np.asarray(img.resize(size), dtype=np.float32)
+            yield [arr[None]]
+            count += 1
+
+    return gen
+
+
+def main():
+    try:
+        import tensorflow as tf
+    except ImportError as exc:
+        sys.exit(f"conversion requires tensorflow: {exc}")
+
+    mode = sys.argv[1] if len(sys.argv) > 1 else "fp16"
+    if mode not in ("fp16", "dynamic", "int8"):
+        sys.exit(f"unknown mode: {mode} (expected fp16, dynamic or int8)")
+
+    model = tf.keras.models.load_model("tumor_model.keras")
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+
+    if mode == "fp16":
+        converter.target_spec.supported_types = [tf.float16]
+        out_path = FP16_PATH
+    elif mode == "dynamic":
+        # Optimize.DEFAULT alone = dynamic-range: int8 weights, fp32
+        # activations quantized per call; no representative dataset needed.
+        out_path = DYNAMIC_PATH
+    else:
+        calib_dir = sys.argv[2] if len(sys.argv) > 2 else "calibration"
+        if not os.path.isdir(calib_dir):
+            sys.exit(f"calibration directory not found: {calib_dir}")
+        converter.representative_dataset = _representative_dataset(calib_dir)
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        out_path = INT8_PATH
+
+    with open(out_path, "wb") as f:
+        f.write(converter.convert())
+    print(f"Wrote {out_path}")
+
+
+if __name__ == "__main__":
+    main()
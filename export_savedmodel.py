@@ -0,0 +1,29 @@
+"""One-time export of tumor_model.keras to the SavedModel format.
+
+    python export_savedmodel.py
+
+Loading the .keras archive rebuilds the EfficientNet layer graph in Python
+(~1-2 s of cold start); a SavedModel restore is dominated by an mmap of the
+variables file and a protobuf parse, with no Keras layer reassembly. The
+result lands in `tumor_model_savedmodel/`, which the app serves through its
+serving_default signature in preference to the .keras file.
+"""
+
+import sys
+
+EXPORT_PATH = "tumor_model_savedmodel"
+
+
+def main():
+    try:
+        import tensorflow as tf
+    except ImportError as exc:
+        sys.exit(f"export requires tensorflow: {exc}")
+
+    model = tf.keras.models.load_model("tumor_model.keras")
+    model.export(EXPORT_PATH)
+    print(f"Wrote {EXPORT_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,372 @@
+"""Model loading and prediction for the brain-tumor classifier.
+
+Shared by any UI surface (app.py today; a future API or second Streamlit
+page imports the same singletons) so TensorFlow, the model weights and the
+prediction caches exist once per Python process. The backend selection
+chain, the decode/resize path and the st.cache_data-backed prediction
+entry points all live here; app.py only renders.
+"""
+
+import io
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import streamlit as st
+from PIL import Image
+
+tf = None  # populated on first use by _import_tf(); see load_model()
+
+# oneDNN/threading knobs must be in the environment before TensorFlow is
+# first imported (which happens lazily in _import_tf); setdefault keeps any
+# deployment-level overrides intact.
+os.environ.setdefault("TF_ENABLE_ONEDNN_OPTS", "1")
+os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "2")
+os.environ.setdefault("TF_NUM_INTRAOP_THREADS", str(os.cpu_count() or 4))
+# One op at a time: this app runs a single sequential model per request,
+# so inter-op parallelism only fragments the core budget intra-op needs.
+os.environ.setdefault("TF_NUM_INTEROP_THREADS", "1")
+os.environ.setdefault("OMP_NUM_THREADS", str(os.cpu_count() or 4))
+# Pin OMP workers to cores and park them quickly after a conv finishes:
+# thread migration between bursts is pure cache-miss overhead for the
+# short, latency-bound inferences this app runs.
+os.environ.setdefault("KMP_AFFINITY", "granularity=fine,compact,1,0")
+os.environ.setdefault("KMP_BLOCKTIME", "1")
+
+try:
+    import simplejpeg  # optional: SIMD JPEG decode via libjpeg-turbo
+except ImportError:
+    simplejpeg = None
+
+CLASS_NAMES = ["glioma", "meningioma", "notumor", "pituitary"]
+
+MODEL_INPUT_SIZE = (300, 300)
+
+MODEL_PATH = "tumor_model.keras"
+TRT_ENGINE_PATH = "tumor_model.plan"
+TFLITE_INT8_PATH = "tumor_model_int8.tflite"
+TFLITE_FP16_PATH = "tumor_model_fp16.tflite"
+ONNX_PATH = "tumor_model.onnx"
+TRT_SAVEDMODEL_PATH = "tumor_model_trt"
+SAVEDMODEL_PATH = "tumor_model_savedmodel"
+
+
+class _TritonPredictor:
+    """Sends inference to an out-of-process Triton server over HTTP.
+
+    Configured via TUMOR_TRITON_URL (e.g. "triton:8000"); the server owns the
+    model weights and dynamic batching, so Streamlit workers stay stateless
+    and concurrent sessions share one coalesced batch on the server.
+    """
+
+    def __init__(self, url, model_name="tumor"):
+        import tritonclient.http as triton_http
+
+        self._triton = triton_http
+        self._client = triton_http.InferenceServerClient(url)
+        self._model_name = model_name
+
+    def predict(self, img_array, verbose=0):
+        inp = self._triton.InferInput("input", list(img_array.shape), "FP32")
+        inp.set_data_from_numpy(img_array.astype(np.float32))
+        result = self._client.infer(self._model_name, inputs=[inp])
+        output_name = result.get_response()["outputs"][0]["name"]
+        return result.as_numpy(output_name)
+
+
+class _OnnxPredictor:
+    """Runs the ONNX graph built by convert_onnx.py through ONNX Runtime."""
+
+    def __init__(self, model_path):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = os.cpu_count()
+        self._session = ort.InferenceSession(
+            model_path, sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        self._input_name = self._session.get_inputs()[0].name
+
+    def predict(self, img_array, verbose=0):
+        arr = img_array.astype(np.float32)
+        return self._session.run(None, {self._input_name: arr})[0]
+
+
+class _TflitePredictor:
+    """Runs a quantized .tflite model built by convert_tflite.py.
+
+    Prefers the lightweight tflite_runtime package (XNNPACK-backed, ~a few MB
+    of RSS) so serving a .tflite artifact never has to import full
+    TensorFlow; tf.lite is only a fallback.
+    """
+
+    def __init__(self, model_path):
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            Interpreter = _import_tf().lite.Interpreter
+        self._interpreter = Interpreter(
+            model_path=model_path, num_threads=os.cpu_count()
+        )
+        self._interpreter.allocate_tensors()
+        self._input_detail = self._interpreter.get_input_details()[0]
+        self._output_detail = self._interpreter.get_output_details()[0]
+
+    def predict(self, img_array, verbose=0):
+        if img_array.shape[0] > 1:  # interpreter tensors are allocated for batch-of-1
+            return np.concatenate(
+                [self.predict(img_array[i : i + 1]) for i in range(img_array.shape[0])]
+            )
+        detail = self._input_detail
+        arr = img_array.astype(np.float32)
+        if detail["dtype"] != np.float32:
+            scale, zero_point = detail["quantization"]
+            arr = np.round(arr / scale + zero_point).astype(detail["dtype"])
+        self._interpreter.set_tensor(detail["index"], arr)
+        self._interpreter.invoke()
+        out = self._interpreter.get_tensor(self._output_detail["index"])
+        if self._output_detail["dtype"] != np.float32:
+            scale, zero_point = self._output_detail["quantization"]
+            out = (out.astype(np.float32) - zero_point) * scale
+        return out
+
+
+class _TrtPredictor:
+    """Runs the FP16 TensorRT engine built by convert_tensorrt.py.
+
+    Exposes the same `predict(arr, verbose=0)` shape as a Keras model so the
+    inference call site does not care which backend is active.
+    """
+
+    def __init__(self, engine_path):
+        import tensorrt as trt
+        import pycuda.autoinit  # noqa: F401 - initializes the CUDA context
+        import pycuda.driver as cuda
+
+        self._cuda = cuda
+        logger = trt.Logger(trt.Logger.WARNING)
+        with open(engine_path, "rb") as f:
+            self._engine = trt.Runtime(logger).deserialize_cuda_engine(f.read())
+        self._context = self._engine.create_execution_context()
+        self._input = np.empty((1, 300, 300, 3), dtype=np.float32)
+        self._output = np.empty((1, len(CLASS_NAMES)), dtype=np.float32)
+        self._d_input = cuda.mem_alloc(self._input.nbytes)
+        self._d_output = cuda.mem_alloc(self._output.nbytes)
+        self._bindings = [int(self._d_input), int(self._d_output)]
+
+    def predict(self, img_array, verbose=0):
+        if img_array.shape[0] > 1:  # engine is built for batch-of-1
+            return np.concatenate(
+                [self.predict(img_array[i : i + 1]) for i in range(img_array.shape[0])]
+            )
+        np.copyto(self._input, img_array)
+        self._cuda.memcpy_htod(self._d_input, self._input)
+        self._context.execute_v2(self._bindings)
+        self._cuda.memcpy_dtoh(self._output, self._d_output)
+        return self._output.copy()
+
+
+class _SavedModelPredictor:
+    """Runs a SavedModel signature, e.g. the TF-TRT graph from convert_tensorrt.py.
+
+    TF-TRT SavedModels carry their TensorRT-optimized segments inside the
+    graph, so loading through the standard serving_default signature is all
+    that is needed to hit tensor-core INT8/FP16 kernels.
+    """
+
+    def __init__(self, model_dir):
+        _import_tf()
+        self._infer = tf.saved_model.load(model_dir).signatures["serving_default"]
+        self._output_key = next(iter(self._infer.structured_outputs))
+
+    def predict(self, img_array, verbose=0):
+        out = self._infer(tf.constant(img_array.astype(np.float32)))
+        return out[self._output_key].numpy()
+
+
+class _KerasPredictor:
+    """Runs the Keras model through a tf.function traced once.
+
+    model.predict carries per-call Keras overhead (callback machinery,
+    batching logic, progress bars) that dwarfs a single-image forward pass;
+    calling the concrete function traced for (N, 300, 300, 3) skips all of it.
+    """
+
+    def __init__(self, keras_model):
+        self._model = keras_model
+        self._infer = self._trace(jit_compile=True)
+        try:
+            # Compile eagerly so users never see the XLA compile cost.
+            self._infer(tf.zeros((1,) + MODEL_INPUT_SIZE + (3,), dtype=tf.uint8))
+        except Exception:
+            # XLA unsupported on this host/op set - keep the plain trace.
+            self._infer = self._trace(jit_compile=False)
+
+    def _trace(self, jit_compile):
+        return tf.function(
+            lambda x: self._model(x, training=False),
+            input_signature=[tf.TensorSpec((None,) + MODEL_INPUT_SIZE + (3,), tf.uint8)],
+            jit_compile=jit_compile,
+        )
+
+    def predict(self, img_array, verbose=0):
+        return self._infer(tf.convert_to_tensor(img_array)).numpy()
+
+
+def _wrap_uint8_input(base_model):
+    """Fuse preprocessing into the model graph.
+
+    EfficientNet's Keras `preprocess_input` is an identity (normalization
+    lives inside the model), so preprocessing reduces to the uint8->float32
+    cast. Doing it in-graph lets the app feed raw uint8 pixels, quartering
+    the bytes handed to TF per request.
+    """
+    inp = tf.keras.Input(shape=MODEL_INPUT_SIZE + (3,), dtype=tf.uint8)
+    out = base_model(tf.cast(inp, tf.float32))
+    return tf.keras.Model(inp, out)
+
+
+def _import_tf():
+    """Import TensorFlow on first use.
+
+    The import costs seconds of cold start and hundreds of MB of RSS; users
+    who never upload a scan should not pay it just to see the landing page.
+    Everything below load_model() runs after this, so the bare `tf` module
+    references in the predictor classes resolve fine.
+    """
+    global tf
+    if tf is None:
+        import tensorflow
+        tf = tensorflow
+    return tf
+
+
+@st.cache_resource
+def load_model():
+    model = None
+    triton_url = os.environ.get("TUMOR_TRITON_URL")
+    if triton_url:
+        try:
+            model = _TritonPredictor(triton_url)
+        except Exception:
+            pass  # server/client unavailable - fall back to in-process backends
+    if model is None and os.path.exists(TRT_ENGINE_PATH):
+        try:
+            model = _TrtPredictor(TRT_ENGINE_PATH)
+        except Exception:
+            pass  # no TensorRT/CUDA on this host - fall back to Keras
+    if model is None and os.path.isdir(TRT_SAVEDMODEL_PATH):
+        try:
+            model = _SavedModelPredictor(TRT_SAVEDMODEL_PATH)
+        except Exception:
+            pass  # TF-TRT runtime unavailable - fall back to other backends
+    # FP16 weights are the safer default (INT8 TFLite can be slower than FP32
+    # on desktop x86); opt into the INT8 artifact with TUMOR_TFLITE_INT8=1.
+    tflite_paths = [TFLITE_FP16_PATH, TFLITE_INT8_PATH]
+    if os.environ.get("TUMOR_TFLITE_INT8") == "1":
+        tflite_paths.reverse()
+    for tflite_path in tflite_paths:
+        if model is None and os.path.exists(tflite_path):
+            model = _TflitePredictor(tflite_path)
+    if model is None and os.path.exists(ONNX_PATH):
+        try:
+            model = _OnnxPredictor(ONNX_PATH)
+        except ImportError:
+            pass  # onnxruntime not installed - fall back to Keras
+    # A plain SavedModel export (export_savedmodel.py) restores via an mmap
+    # of the variables file instead of rebuilding the Keras layer graph in
+    # Python, cutting 1-2s off cold start versus the .keras archive.
+    if model is None and os.path.isdir(SAVEDMODEL_PATH):
+        try:
+            model = _SavedModelPredictor(SAVEDMODEL_PATH)
+        except Exception:
+            pass  # stale/incompatible export - fall back to the .keras file
+    if model is None:
+        _import_tf()
+        # Grow GPU memory on demand instead of letting TF preallocate all
+        # VRAM, so co-tenant processes can share the device.
+        for gpu in tf.config.list_physical_devices("GPU"):
+            try:
+                tf.config.experimental.set_memory_growth(gpu, True)
+            except RuntimeError:
+                pass  # device already initialized; keep its current policy
+        model = _KerasPredictor(_wrap_uint8_input(tf.keras.models.load_model(MODEL_PATH)))
+    # Warm-up forward pass so kernel selection/autotuning happens once at
+    # process start instead of on the first user upload.
+    model.predict(np.zeros((1,) + MODEL_INPUT_SIZE + (3,), dtype=np.uint8), verbose=0)
+    return model
+
+
+def _prepare_input(image_bytes):
+    """Decode and resize one upload into a (300, 300, 3) uint8 array.
+
+    Single decode->resize->asarray pass: one uint8 copy, no further
+    allocation.
+    """
+    if simplejpeg is not None and image_bytes[:2] == b"\xff\xd8":
+        image = Image.fromarray(simplejpeg.decode_jpeg(image_bytes, colorspace="RGB"))
+    else:
+        image = Image.open(io.BytesIO(image_bytes))
+        # Ask libjpeg for IDCT-scaled decoding: a high-res MRI decodes
+        # directly at 1/2-1/8 resolution instead of full size, 2-4x faster.
+        # No-op for PNGs and for images already near 300x300.
+        image.draft("RGB", MODEL_INPUT_SIZE)
+        image = image.convert("RGB")
+    resized = image.resize(MODEL_INPUT_SIZE, Image.Resampling.BILINEAR)
+    # Release the full-resolution decode before inference; only the 300x300
+    # tensor is needed from here on (a 20MP scan otherwise pins ~60MB).
+    del image
+    return np.asarray(resized, dtype=np.uint8)
+
+
+def _build_result(preds):
+    # One vectorized percentage conversion; every consumer (bars, confidence,
+    # charts) reads from the same pass instead of rescaling independently.
+    probs_pct = np.round(np.asarray(preds, dtype=np.float32) * 100.0, 2)
+
+    # One O(N) argmax pass; with only 4 classes a full sort buys nothing here,
+    # and the display ordering is handled by a plain Python sort at render time.
+    top_idx = int(np.argmax(probs_pct))
+
+    return {
+        "class_name": CLASS_NAMES[top_idx],
+        "confidence": float(probs_pct[top_idx]),
+        # Positionally aligned with CLASS_NAMES; a tuple keeps the result
+        # hashable so downstream st.cache_data consumers need no hash_funcs.
+        "probabilities": tuple(probs_pct.tolist()),
+    }
+
+
+# Reusable batch-of-1 input buffer for the common single-upload case, so a
+# fresh ~270KB tensor isn't allocated per inference. Guarded because
+# Streamlit runs sessions on separate threads.
+_SINGLE_BATCH = np.empty((1,) + MODEL_INPUT_SIZE + (3,), dtype=np.uint8)
+_SINGLE_BATCH_LOCK = threading.Lock()
+
+# Decodes multi-file uploads in parallel; PIL and libjpeg-turbo release the
+# GIL for the heavy lifting, so the workers genuinely overlap.
+_DECODE_POOL = ThreadPoolExecutor(max_workers=4)
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def real_prediction_batch(files_bytes):
+    """Classify several uploads with one stacked forward pass."""
+    if len(files_bytes) == 1:
+        # Decode on a pool worker while load_model() runs on this thread, so
+        # a cold model load (or backend warm-up) overlaps the PIL work.
+        decoded = _DECODE_POOL.submit(_prepare_input, files_bytes[0])
+        model = load_model()
+        with _SINGLE_BATCH_LOCK:
+            _SINGLE_BATCH[0] = decoded.result()
+            preds = model.predict(_SINGLE_BATCH, verbose=0)
+    else:
+        batch = np.stack(list(_DECODE_POOL.map(_prepare_input, files_bytes)))
+        preds = load_model().predict(batch, verbose=0)
+    return [_build_result(p) for p in preds]
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def real_prediction(image_bytes):
+    return real_prediction_batch((image_bytes,))[0]
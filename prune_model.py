@@ -0,0 +1,63 @@
+"""Magnitude-prune tumor_model.keras for XNNPACK sparse inference.
+
+    python prune_model.py <train_dir> [sparsity]
+
+Wraps the model in prune_low_magnitude at constant sparsity (default 0.8 -
+the threshold XNNPACK's sparse kernels need), fine-tunes briefly on the
+training images (class-per-subdirectory layout, as used for the original
+training run - the dataset itself is not part of this repo), strips the
+pruning wrappers, and converts to `tumor_model_fp16.tflite` with sparsity
+optimization enabled so the app's TFLite backend picks it up. XNNPACK
+detects the sparse weight format automatically at runtime.
+"""
+
+import os
+import sys
+
+
+def main():
+    try:
+        import tensorflow as tf
+        import tensorflow_model_optimization as tfmot
+    except ImportError as exc:
+        sys.exit(f"pruning requires tensorflow and tensorflow_model_optimization: {exc}")
+
+    if len(sys.argv) < 2 or not os.path.isdir(sys.argv[1]):
+        sys.exit("usage: python prune_model.py <train_dir> [sparsity]")
+    train_dir = sys.argv[1]
+    sparsity = float(sys.argv[2]) if len(sys.argv) > 2 else 0.8
+
+    train_ds = tf.keras.utils.image_dataset_from_directory(
+        train_dir, image_size=(300, 300), batch_size=32
+    )
+
+    model = tf.keras.models.load_model("tumor_model.keras")
+    pruned = tfmot.sparsity.keras.prune_low_magnitude(
+        model,
+        pruning_schedule=tfmot.sparsity.keras.ConstantSparsity(sparsity, begin_step=0),
+    )
+    pruned.compile(
+        optimizer="adam",
+        loss="sparse_categorical_crossentropy",
+        metrics=["accuracy"],
+    )
+    pruned.fit(
+        train_ds,
+        epochs=2,
+        callbacks=[tfmot.sparsity.keras.UpdatePruningStep()],
+    )
+    stripped = tfmot.sparsity.keras.strip_pruning(pruned)
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(stripped)
+    converter.optimizations = [
+        tf.lite.Optimize.EXPERIMENTAL_SPARSITY,
+        tf.lite.Optimize.DEFAULT,
+    ]
+    converter.target_spec.supported_types = [tf.float16]
+    with open("tumor_model_fp16.tflite", "wb") as f:
+        f.write(converter.convert())
+    print("Wrote tumor_model_fp16.tflite (sparse)")
+
+
+if __name__ == "__main__":
+    main()